@@ -3,12 +3,16 @@ AutoSec AI - Main FastAPI Application
 Autonomous Cloud Security & Threat Mitigation Agent
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Dict, List, Optional
 import os
+import secrets
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -61,6 +65,17 @@ class ThreatAlert(BaseModel):
     timestamp: datetime
     affected_resources: List[str]
 
+def orjson_response(content: Dict) -> Response:
+    """
+    Serialize a response body with orjson
+    Bypasses jsonable_encoder and stdlib json on hot endpoints, falling
+    back to them for values orjson can't encode (e.g. ints over 64 bits)
+    """
+    try:
+        return Response(content=orjson.dumps(content), media_type="application/json")
+    except orjson.JSONEncodeError:
+        return JSONResponse(jsonable_encoder(content))
+
 ### API Endpoints
 @app.get("/")
 async def root():
@@ -110,12 +125,51 @@ async def ingest_log(log: LogEvent):
     This will be the entry point for log data
     """
     # TODO: Add actual log processing in Week 1 Day 4
-    return {
+    return orjson_response({
         "status": "received",
         "log_id": f"log_{datetime.now().timestamp()}",
         "message": "Log ingested successfully",
-        "log": log.model_dump()
-    }
+        "log": log.model_dump(mode="python")
+    })
+
+async def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """
+    Gate for internal-only routes
+    Callers must send the shared secret from INTERNAL_API_TOKEN in the
+    X-Internal-Token header; with no token configured the routes are closed
+    """
+    expected = os.getenv("INTERNAL_API_TOKEN")
+    if not expected or not x_internal_token or not secrets.compare_digest(
+        x_internal_token.encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+# Routes for trusted in-cluster pipelines, kept out of the public OpenAPI docs
+internal_router = APIRouter(
+    prefix="/api/v1",
+    dependencies=[Depends(verify_internal_token)],
+    include_in_schema=False
+)
+
+@internal_router.post("/logs/ingest_internal")
+async def ingest_log_internal(body: Dict):
+    """
+    Ingest a log event from a trusted internal pipeline
+    
+    Trust boundary: the body is NOT validated (LogEvent.model_construct), so
+    this route must only be reachable by our own pipeline components. Access
+    requires the X-Internal-Token shared secret (see verify_internal_token);
+    external sources must use /api/v1/logs/ingest, which validates fully.
+    """
+    log = LogEvent.model_construct(**body)
+    return orjson_response({
+        "status": "received",
+        "log_id": f"log_{datetime.now().timestamp()}",
+        "message": "Log ingested successfully",
+        "log": log.__dict__
+    })
+
+app.include_router(internal_router)
 
 @app.get("/api/v1/threats")
 async def get_threats(limit: int = 10):
@@ -123,12 +177,12 @@ async def get_threats(limit: int = 10):
     Get recent threat alerts
     """
     # TODO: Connect to database to fetch real alerts
-    return {
+    return orjson_response({
         "threats": [],
         "total": 0,
         "limit": limit,
         "message": "No threats detected yet - database connection pending"
-    }
+    })
 
 @app.get("/api/v1/threats/{alert_id}")
 async def get_threat_detail(alert_id: str):
@@ -191,14 +245,19 @@ if __name__ == "__main__":
     # Get configuration from environment variables
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", "8000"))
-    reload = os.getenv("API_RELOAD", "true").lower() == "true"
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Auto-reload only works with a single worker (set WEB_CONCURRENCY=1)
+    reload = workers == 1 and os.getenv("API_RELOAD", "true").lower() == "true"
     
-    print(f"🛡️  Starting AutoSec AI on {host}:{port}")
+    print(f"🛡️  Starting AutoSec AI on {host}:{port} ({workers} workers)")
     
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
+        workers=workers,  # Endpoints are stateless, one process per core
+        loop="auto" if os.name == "nt" else "uvloop",  # uvloop has no Windows build
+        http="httptools",
         reload=reload,  # Auto-reload on code changes (dev only)
         log_level="info"
-    )
\ No newline at end of file
+    )
@@ -5,9 +5,14 @@ Defines standard format for security logs across different sources
 
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Literal
 from enum import Enum
 
+# numpy/pandas are only needed for batch conversion; import them lazily
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
 class LogSource(str, Enum):
     """Source of the log entry"""
@@ -26,6 +31,13 @@ class ThreatLevel(str, Enum):
     CRITICAL = "critical"
 
 
+# Plain string forms of the enums above, used by SecurityLog. Validating a
+# Literal is a set lookup, much cheaper than Enum coercion on bulk logs;
+# the Enums stay on API-facing models such as ThreatAlert.
+LogSourceName = Literal["cicids", "cloudtrail", "system", "custom"]
+ThreatLevelName = Literal["benign", "low", "medium", "high", "critical"]
+
+
 class SecurityLog(BaseModel):
     """
     Unified security log format
@@ -35,7 +47,7 @@ class SecurityLog(BaseModel):
     # Core identifiers
     log_id: str = Field(..., description="Unique log identifier")
     timestamp: datetime = Field(..., description="When the event occurred")
-    source: LogSource = Field(..., description="Source system")
+    source: LogSourceName = Field(..., description="Source system")
     
     # Network information
     source_ip: Optional[str] = Field(None, description="Source IP address (anonymized)")
@@ -64,7 +76,7 @@ class SecurityLog(BaseModel):
     flags: Optional[Dict[str, int]] = Field(None, description="TCP flags (SYN, ACK, etc)")
     
     # Threat classification
-    threat_level: ThreatLevel = Field(ThreatLevel.BENIGN, description="Threat severity")
+    threat_level: ThreatLevelName = Field(ThreatLevel.BENIGN.value, description="Threat severity")
     threat_type: Optional[str] = Field(None, description="Type of threat (FTP-Patator, DDoS)")
     is_attack: bool = Field(False, description="Whether this is an attack")
     
@@ -99,6 +111,64 @@ class SecurityLog(BaseModel):
         }
 
 
+# CICIDS flag count columns, keyed by TCP flag name
+CICIDS_FLAG_COLUMNS = {
+    'FIN': 'FIN Flag Count',
+    'SYN': 'SYN Flag Count',
+    'RST': 'RST Flag Count',
+    'PSH': 'PSH Flag Count',
+    'ACK': 'ACK Flag Count',
+    'URG': 'URG Flag Count'
+}
+
+
+def _classify_label(label: str) -> ThreatLevel:
+    """Derive a threat level from keywords in a CICIDS attack label"""
+    if label == 'BENIGN':
+        return ThreatLevel.BENIGN
+    elif 'DDoS' in label or 'DoS' in label:
+        return ThreatLevel.CRITICAL
+    elif 'Patator' in label or 'Brute Force' in label:
+        return ThreatLevel.HIGH
+    elif 'PortScan' in label:
+        return ThreatLevel.MEDIUM
+    else:
+        return ThreatLevel.LOW
+
+
+# Labels present in CICIDS 2017 (web attacks use an en dash separator)
+CICIDS_LABELS = [
+    'BENIGN',
+    'DDoS',
+    'DoS Hulk',
+    'DoS GoldenEye',
+    'DoS slowloris',
+    'DoS Slowhttptest',
+    'FTP-Patator',
+    'SSH-Patator',
+    'PortScan',
+    'Bot',
+    'Infiltration',
+    'Heartbleed',
+    'Web Attack \u2013 Brute Force',
+    'Web Attack \u2013 XSS',
+    'Web Attack \u2013 Sql Injection'
+]
+
+_LABEL_TO_LEVEL: Dict[str, ThreatLevel] = {
+    label: _classify_label(label) for label in CICIDS_LABELS
+}
+
+
+def threat_level_for_label(label: str) -> ThreatLevel:
+    """Map a CICIDS attack label to a threat level"""
+    level = _LABEL_TO_LEVEL.get(label)
+    if level is None:
+        # Unseen spelling (e.g. latin-1 decoded dash) - classify once and remember
+        level = _LABEL_TO_LEVEL[label] = _classify_label(label)
+    return level
+
+
 class CICIDSToUnified:
     """Convert CICIDS format to unified schema"""
     
@@ -115,35 +185,25 @@ class CICIDSToUnified:
             SecurityLog object
         """
         
-        # Determine threat level from label
+        # Determine threat level from label; a missing label (NaN from an
+        # empty CSV cell) is treated like an absent Label column: BENIGN
         label = cicids_row.get('Label', 'BENIGN')
+        if not isinstance(label, str):
+            label = 'BENIGN'
         is_attack = label != 'BENIGN'
-        
-        if label == 'BENIGN':
-            threat_level = ThreatLevel.BENIGN
-        elif 'DDoS' in label or 'DoS' in label:
-            threat_level = ThreatLevel.CRITICAL
-        elif 'Patator' in label or 'Brute Force' in label:
-            threat_level = ThreatLevel.HIGH
-        elif 'PortScan' in label:
-            threat_level = ThreatLevel.MEDIUM
-        else:
-            threat_level = ThreatLevel.LOW
+        threat_level = threat_level_for_label(label)
         
         # Extract flags
         flags = {
-            'FIN': int(cicids_row.get('FIN Flag Count', 0)),
-            'SYN': int(cicids_row.get('SYN Flag Count', 0)),
-            'RST': int(cicids_row.get('RST Flag Count', 0)),
-            'PSH': int(cicids_row.get('PSH Flag Count', 0)),
-            'ACK': int(cicids_row.get('ACK Flag Count', 0)),
-            'URG': int(cicids_row.get('URG Flag Count', 0))
+            flag: int(cicids_row.get(column, 0))
+            for flag, column in CICIDS_FLAG_COLUMNS.items()
         }
         
-        return SecurityLog(
+        # All fields are produced here, so skip re-validating them
+        return SecurityLog.model_construct(
             log_id=log_id,
             timestamp=datetime.now(),  # CICIDS doesn't have timestamps, use current
-            source=LogSource.CICIDS,
+            source=LogSource.CICIDS.value,
             destination_port=int(cicids_row.get('Destination Port', 0)),
             protocol="TCP",  # CICIDS is mostly TCP
             action="network_flow",
@@ -161,7 +221,7 @@ class CICIDSToUnified:
             packets_per_second=float(cicids_row.get('Flow Packets/s', 0)),
             bytes_per_second=float(cicids_row.get('Flow Bytes/s', 0)),
             flags=flags,
-            threat_level=threat_level,
+            threat_level=threat_level.value,
             threat_type=label if is_attack else None,
             is_attack=is_attack,
             metadata={
@@ -171,6 +231,139 @@ class CICIDSToUnified:
                 'bwd_psh_flags': cicids_row.get('Bwd PSH Flags', 0)
             }
         )
+    
+    @staticmethod
+    def to_arrays(df: "pd.DataFrame") -> Dict[str, "np.ndarray"]:
+        """
+        Convert a whole CICIDS DataFrame to unified fields at once
+        
+        Vectorized equivalent of convert() that works on columns instead
+        of rows and returns a struct of arrays (one entry per row)
+        
+        Args:
+            df: CICIDS DataFrame with stripped column names
+        
+        Returns:
+            Dict mapping unified field name to a NumPy array
+        """
+        import numpy as np
+        import pandas as pd
+        
+        n = len(df)
+        
+        def column(name: str, dtype) -> "np.ndarray":
+            if name not in df.columns:
+                return np.zeros(n, dtype=dtype)
+            return df[name].to_numpy(dtype=dtype)
+        
+        # Classify each distinct label once instead of once per row
+        if 'Label' in df.columns:
+            codes, uniques = pd.factorize(df['Label'])
+            # Missing labels get code -1; give them their own BENIGN slot
+            # (same as convert()) instead of wrapping to the last label
+            codes = np.where(codes < 0, len(uniques), codes)
+            uniques = np.append(np.asarray(uniques, dtype=object), 'BENIGN')
+        else:
+            codes = np.zeros(n, dtype=np.intp)
+            uniques = np.array(['BENIGN'], dtype=object)
+        
+        unique_attack = uniques != 'BENIGN'
+        unique_levels = np.array(
+            [threat_level_for_label(label).value for label in uniques], dtype=object
+        )
+        is_attack = unique_attack[codes]
+        
+        arrays = {
+            'destination_port': column('Destination Port', np.int64),
+            'flow_duration': column('Flow Duration', np.float64),
+            'total_packets': (
+                column('Total Fwd Packets', np.float64) +
+                column('Total Backward Packets', np.float64)
+            ).astype(np.int64),
+            'total_bytes': (
+                column('Total Length of Fwd Packets', np.float64) +
+                column('Total Length of Bwd Packets', np.float64)
+            ).astype(np.int64),
+            'packets_per_second': column('Flow Packets/s', np.float64),
+            'bytes_per_second': column('Flow Bytes/s', np.float64),
+            'threat_level': unique_levels[codes],
+            'threat_type': np.where(is_attack, uniques[codes], None),
+            'is_attack': is_attack,
+            'avg_packet_size': column('Average Packet Size', np.float64),
+            'flow_iat_mean': column('Flow IAT Mean', np.float64),
+            'fwd_psh_flags': column('Fwd PSH Flags', np.int64),
+            'bwd_psh_flags': column('Bwd PSH Flags', np.int64)
+        }
+        for flag, name in CICIDS_FLAG_COLUMNS.items():
+            arrays[f'flags_{flag}'] = column(name, np.int64)
+        
+        return arrays
+    
+    @staticmethod
+    def convert_batch(df: "pd.DataFrame", log_ids: List[str]) -> List[SecurityLog]:
+        """
+        Convert a whole CICIDS DataFrame to unified schema
+        
+        Fields are computed column-wise with to_arrays(); SecurityLog objects
+        are only built at the end, without re-validation. Pipelines that
+        don't need objects should use to_arrays() directly.
+        
+        Args:
+            df: CICIDS DataFrame with stripped column names
+            log_ids: Unique identifier for each row, in row order
+        
+        Returns:
+            List of SecurityLog objects
+        
+        Raises:
+            ValueError: If log_ids doesn't have one entry per row
+        """
+        if len(log_ids) != len(df):
+            raise ValueError(
+                f"Expected {len(df)} log_ids (one per row), got {len(log_ids)}"
+            )
+        
+        # tolist() converts whole columns to Python scalars in one C call
+        columns = {
+            name: values.tolist()
+            for name, values in CICIDSToUnified.to_arrays(df).items()
+        }
+        flag_columns = {
+            flag: columns[f'flags_{flag}'] for flag in CICIDS_FLAG_COLUMNS
+        }
+        timestamp = datetime.now()  # CICIDS doesn't have timestamps, use current
+        
+        logs = []
+        for i, log_id in enumerate(log_ids):
+            is_attack = columns['is_attack'][i]
+            port = columns['destination_port'][i]
+            logs.append(SecurityLog.model_construct(
+                log_id=log_id,
+                timestamp=timestamp,
+                source=LogSource.CICIDS.value,
+                destination_port=port,
+                protocol="TCP",
+                action="network_flow",
+                resource=f"port_{port}",
+                status="success" if not is_attack else "suspicious",
+                flow_duration=columns['flow_duration'][i],
+                total_packets=columns['total_packets'][i],
+                total_bytes=columns['total_bytes'][i],
+                packets_per_second=columns['packets_per_second'][i],
+                bytes_per_second=columns['bytes_per_second'][i],
+                flags={flag: values[i] for flag, values in flag_columns.items()},
+                threat_level=columns['threat_level'][i],
+                threat_type=columns['threat_type'][i],
+                is_attack=is_attack,
+                metadata={
+                    'avg_packet_size': columns['avg_packet_size'][i],
+                    'flow_iat_mean': columns['flow_iat_mean'][i],
+                    'fwd_psh_flags': columns['fwd_psh_flags'][i],
+                    'bwd_psh_flags': columns['bwd_psh_flags'][i]
+                }
+            ))
+        
+        return logs
 
 
 class ThreatAlert(BaseModel):
@@ -214,12 +407,12 @@ if __name__ == "__main__":
     log = SecurityLog(
         log_id="test_001",
         timestamp=datetime.now(),
-        source=LogSource.CICIDS,
+        source="cicids",
         source_ip="192.168.1.100",
         destination_port=22,
         action="ssh_attempt",
         status="failed",
-        threat_level=ThreatLevel.HIGH,
+        threat_level="high",
         is_attack=True
     )
     
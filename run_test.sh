@@ -14,7 +14,7 @@ fi
 
 # Install test dependencies if needed
 echo "📦 Checking test dependencies..."
-pip install -q pytest pytest-asyncio pytest-cov httpx
+pip install -q pytest pytest-asyncio pytest-cov pytest-xdist httpx
 
 echo ""
 echo "🏃 Running tests..."
@@ -5,8 +5,7 @@ NO synthetic/fake data generation
 """
 
 import os
-import requests
-import json
+import orjson
 from pathlib import Path
 from datetime import datetime
 import zipfile
@@ -15,6 +14,23 @@ import io
 DATA_DIR = Path("data")
 RAW_DIR = DATA_DIR / "raw"
 THREAT_INTEL_DIR = DATA_DIR / "threat_intel"
+CHUNK_SIZE = 1024 * 1024
+
+def stream_to_file(url, output_file, headers=None):
+    """
+    Write a response body to disk in chunks without holding it in memory
+    The body goes to a .part file that only replaces output_file once the
+    download completes, so an interrupted run never leaves a truncated file
+    """
+    import requests
+    
+    part_file = output_file.with_suffix('.part')
+    with requests.get(url, headers=headers, timeout=60, stream=True) as response:
+        response.raise_for_status()
+        with open(part_file, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+    os.replace(part_file, output_file)
 
 for directory in [DATA_DIR, RAW_DIR, THREAT_INTEL_DIR]:
     directory.mkdir(exist_ok=True)
@@ -32,14 +48,9 @@ def download_mitre_attack():
     
     try:
         print(f"   Fetching from: {url}")
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        stream_to_file(url, output_file)
         
+        data = orjson.loads(output_file.read_bytes())
         techniques = [obj for obj in data['objects'] if obj['type'] == 'attack-pattern']
         
         print(f" MITRE ATT&CK data saved: {output_file}")
@@ -47,8 +58,7 @@ def download_mitre_attack():
         print(f" Attack techniques: {len(techniques)}")
         
         techniques_file = THREAT_INTEL_DIR / "mitre_techniques.json"
-        with open(techniques_file, 'w') as f:
-            json.dump(techniques[:], f, indent=2)  
+        techniques_file.write_bytes(orjson.dumps(techniques))
         
         return True
     except Exception as e:
@@ -88,11 +98,7 @@ def download_cve_data():
     try:
         print(f"   Fetching from: {url}")
         headers = {'User-Agent': 'AutoSecAI-Research/1.0'}
-        response = requests.get(url, headers=headers, timeout=60)
-        response.raise_for_status()
-        
-        with open(output_file, 'w') as f:
-            json.dump(response.json(), f, indent=2)
+        stream_to_file(url, output_file, headers=headers)
         
         print(f"CVE data saved: {output_file}")
         print(f"File size: {output_file.stat().st_size / 1024:.2f} KB")
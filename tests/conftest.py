@@ -0,0 +1,50 @@
+"""
+Shared pytest fixtures for the AutoSec AI test suite
+"""
+
+import pytest_asyncio
+import httpx
+
+from main import app  # backend/api is on pythonpath (pytest.ini)
+from tests.constants import BASE_URL, INGEST_URL
+
+# Minimal valid event used only to warm up the ingest route
+WARMUP_LOG = {
+    "timestamp": "2024-01-01T00:00:00",
+    "source_ip": "10.0.0.1",
+    "action": "warmup",
+    "resource": "/",
+    "status": "success"
+}
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """
+    Single async client for the whole session
+    Talks to the app in-process over ASGI (no TestClient thread bridge) and
+    runs the app's startup/shutdown events once, not per test.
+    
+    Before handing the client out it pays the one-time costs: it builds and
+    caches the OpenAPI schema and sends a first request through the
+    ingest/threat routes (validator and serializer setup). Tests that don't
+    request the client (e.g. the loader/schema unit tests) skip all of this.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as c:
+            app.openapi()
+            await c.post(INGEST_URL, json=WARMUP_LOG)
+            await c.get("/api/v1/threats")
+            yield c
+
+
+# Pytest configuration
+def pytest_configure(config):
+    """Configure pytest with custom markers"""
+    config.addinivalue_line(
+        "markers", "integration: mark test as an integration test"
+    )
+    config.addinivalue_line(
+        "markers", "slow: mark test as slow running"
+    )
@@ -0,0 +1,13 @@
+"""
+URL constants shared by the test fixtures and test modules
+"""
+
+# Base URL of the in-process client (see the client fixture in conftest)
+BASE_URL = "http://test"
+
+# Absolute URLs (built on the client's base_url) skip per-call URL joining
+# on the routes posted to most
+INGEST_INTERNAL_PATH = "/api/v1/logs/ingest_internal"
+INGEST_URL = f"{BASE_URL}/api/v1/logs/ingest"
+INGEST_INTERNAL_URL = f"{BASE_URL}{INGEST_INTERNAL_PATH}"
+ANALYZE_URL = f"{BASE_URL}/api/v1/analyze"
@@ -0,0 +1,91 @@
+"""
+Test Suite for the dataset loaders
+Tests CICIDS cleaning and MITRE technique search
+"""
+
+import pytest
+import orjson
+import numpy as np
+import pandas as pd
+
+from backend.utils.data_loader import CICIDSLoader, MITRELoader, TERM_CACHE_SIZE
+
+
+class TestCleanData:
+    """Test CICIDS cleaning and dtype narrowing"""
+
+    def test_clean_data_keeps_integer_columns_integer(self):
+        """Counters with gaps (read as float64) come back as ints, not float32,
+        while float features stay float32 even when their values are whole"""
+        df = pd.DataFrame({
+            "Destination Port": [80, np.nan, 443, 22],
+            "Flow Duration": [10, 20, np.nan, 40],
+            "Total Fwd Packets": [1, 2, 3, 4],
+            "SYN Flag Count": [0, 1, np.nan, 1],
+            "Flow Bytes/s": [1.5, np.inf, 2.0, np.nan],
+            "Fwd Packet Length Std": [1.0, 2.0, np.nan, 4.0],
+            "Label": ["BENIGN", "BENIGN", "DDoS", "BENIGN"]
+        })
+        cleaned = CICIDSLoader().clean_data(df)
+
+        assert cleaned.dtypes[["Destination Port", "Flow Duration", "Total Fwd Packets"]].eq("int32").all()
+        assert cleaned["SYN Flag Count"].dtype == np.uint8
+        assert cleaned.dtypes[["Flow Bytes/s", "Fwd Packet Length Std"]].eq("float32").all()
+        assert cleaned["Destination Port"].tolist() == [80, 80, 443, 22]
+        assert not cleaned.select_dtypes(include=[np.number]).isna().any().any()
+
+
+class TestLoadTable:
+    """Test Arrow CSV loading"""
+
+    def test_load_table_reads_latin1_with_arrow(self, tmp_path, capsys):
+        """Latin-1 day files are re-read by Arrow, not handed to pandas"""
+        (tmp_path / "day.csv").write_bytes(
+            b" Destination Port, Flow Duration, Label\n"
+            b"80,10,BENIGN\n"
+            b"80,20,Web Attack \x96 XSS\n"
+        )
+        table = CICIDSLoader(str(tmp_path)).load_table("day.csv")
+
+        assert table.column_names == ["Destination Port", "Flow Duration", "Label"]
+        assert table.column("Label").to_pylist() == ["BENIGN", "Web Attack \x96 XSS"]
+        assert "re-reading as latin-1" in capsys.readouterr().out
+
+
+class TestMITRESearch:
+    """Test the indexed MITRE technique search"""
+
+    TECHNIQUES = [
+        {"name": "Brute Force", "description": "Adversaries may use brute force to gain access.",
+         "external_references": [{"external_id": "T1110"}]},
+        {"name": "Valid Accounts", "description": "Abuse of credentials for privilege escalation.",
+         "external_references": [{"external_id": "T1078"}]},
+        {"name": "Exploitation for Privilege Escalation", "description": "Exploit software vulnerabilities.",
+         "external_references": [{"external_id": "T1068"}]},
+        {"name": "Password Spraying", "description": "A brute-force variant using one password."},
+    ]
+
+    @pytest.fixture
+    def loader(self, tmp_path):
+        (tmp_path / "mitre_techniques.json").write_bytes(orjson.dumps(self.TECHNIQUES))
+        return MITRELoader(str(tmp_path))
+
+    @pytest.mark.parametrize("query", [
+        "brute force", "Brute", "brute-force", "privilege", "vilege esc",
+        "access.", "password", "t", "", "no such technique"
+    ])
+    def test_search_matches_linear_scan(self, loader, query):
+        """Index lookups must return exactly what a full substring scan does"""
+        query_lower = query.lower()
+        expected = [
+            technique for technique in self.TECHNIQUES
+            if query_lower in technique["name"].lower()
+            or query_lower in technique["description"].lower()
+        ]
+        assert loader.search_technique(query) == expected
+
+    def test_term_cache_is_bounded(self, loader):
+        """Distinct query words must not grow the memo without limit"""
+        for i in range(TERM_CACHE_SIZE + 10):
+            loader.search_technique(f"term{i}")
+        assert loader._postings.cache_info().currsize <= TERM_CACHE_SIZE
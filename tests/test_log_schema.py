@@ -0,0 +1,72 @@
+"""
+Test Suite for the unified log schema
+Tests CICIDS row conversion (per-row and vectorized)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend.models.log_schema import CICIDSToUnified
+
+
+class TestToArrays:
+    """Test vectorized CICIDS conversion"""
+
+    def test_missing_label_is_benign(self):
+        """A NaN label must not pick up another row's label"""
+        df = pd.DataFrame({
+            "Destination Port": [80, 22, 443],
+            "Label": ["BENIGN", "SSH-Patator", np.nan]
+        })
+        arrays = CICIDSToUnified.to_arrays(df)
+
+        assert arrays["is_attack"].tolist() == [False, True, False]
+        assert arrays["threat_type"].tolist() == [None, "SSH-Patator", None]
+        assert arrays["threat_level"][2] == "benign"
+
+
+class TestConvertBatch:
+    """Test that batch conversion matches per-row conversion"""
+
+    FRAME = pd.DataFrame({
+        "Destination Port": [80, 22, 8080, 443],
+        "Flow Duration": [1000, 250, 0, 42],
+        "Total Fwd Packets": [3, 10, 1, 2],
+        "Total Backward Packets": [2, 0, 0, 1],
+        "Total Length of Fwd Packets": [120, 900, 0, 60],
+        "Total Length of Bwd Packets": [80, 0, 0, 40],
+        "Flow Bytes/s": [2e5, 3.6e6, 0.0, 2.4e6],
+        "Flow Packets/s": [5e3, 4e4, 0.0, 7.1e4],
+        "Flow IAT Mean": [250.0, 27.7, 0.0, 21.0],
+        "Fwd PSH Flags": [0, 1, 0, 0],
+        "Bwd PSH Flags": [0, 0, 0, 0],
+        "FIN Flag Count": [1, 0, 0, 1],
+        "SYN Flag Count": [0, 1, 0, 1],
+        "ACK Flag Count": [1, 1, 0, 1],
+        "Average Packet Size": [40.0, 90.0, 0.0, 33.3],
+        # Web attack labels decode with '\x96' when read as latin-1
+        "Label": ["BENIGN", "SSH-Patator", "Web Attack \x96 Brute Force", np.nan]
+    })
+
+    def test_convert_batch_matches_convert(self):
+        """Every field except the generation timestamp must agree, types included"""
+        log_ids = [f"log_{i}" for i in range(len(self.FRAME))]
+        batch = CICIDSToUnified.convert_batch(self.FRAME, log_ids)
+        rows = [
+            CICIDSToUnified.convert(row, log_id)
+            for row, log_id in zip(self.FRAME.to_dict("records"), log_ids)
+        ]
+
+        assert len(batch) == len(rows)
+        for got, expected in zip(batch, rows):
+            # Compare JSON, not dicts: 1 == 1.0 would hide int/float drift
+            assert got.model_dump_json(exclude={"timestamp"}) == expected.model_dump_json(
+                exclude={"timestamp"}
+            )
+
+    @pytest.mark.parametrize("count", [0, 3, 5])
+    def test_convert_batch_rejects_wrong_id_count(self, count):
+        """log_ids must have exactly one entry per row"""
+        with pytest.raises(ValueError):
+            CICIDSToUnified.convert_batch(self.FRAME, [f"log_{i}" for i in range(count)])